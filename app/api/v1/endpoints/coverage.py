@@ -1,10 +1,23 @@
+import asyncio
+import contextlib
+import hashlib
+import orjson
+import os
+import re
+import shutil
+import tempfile
 import time
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from typing import List
 
-from app.schemas.coverage import CoverageResponse, HealthResponse
-from app.services.pdf_extractor import PDFExtractor
-from app.services.insurance_analyzer import InsuranceAnalyzer
+from app.schemas.coverage import CoverageResponse, HealthResponse, UploadCompleteRequest
+from app.services.pdf_extractor import PDFExtractor, get_extractor
+from app.services.insurance_analyzer import InsuranceAnalyzer, get_analyzer
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,15 +27,164 @@ router = APIRouter(tags=["coverage"])
 # ── Dependency injection ───────────────────────────────────────────────────────
 
 def get_pdf_extractor() -> PDFExtractor:
-    return PDFExtractor()
+    return get_extractor()
 
 def get_insurance_analyzer() -> InsuranceAnalyzer:
-    return InsuranceAnalyzer()
+    return get_analyzer()
 
 # ── Constants ──────────────────────────────────────────────────────────────────
 
 ALLOWED_CONTENT_TYPES = {"application/pdf"}
 MAX_FILE_SIZE_BYTES = 20 * 1024 * 1024  # 20 MB per file
+UPLOAD_CHUNK_SIZE = 1024 * 1024         # stream uploads to disk in 1 MB chunks
+
+# ── Chunked upload state ───────────────────────────────────────────────────────
+# Parts land in a per-upload temp directory and are assembled on completion.
+# All bookkeeping lives on that shared disk (a "total" marker plus the part
+# files themselves), so under gunicorn the chunks of one upload may land on
+# any mix of workers and completion still sees them all.
+CHUNK_UPLOAD_DIR = os.path.join(tempfile.gettempdir(), "insurance_chatbot_uploads")
+MAX_ACTIVE_UPLOADS = 32        # concurrent in-progress uploads
+UPLOAD_TTL_SECONDS = 60 * 60   # abandoned upload directories are reaped after an hour
+# Chunked transfers exist for PDFs too large for one request, but the whole
+# must still land somewhere sane — matches the Content-Length middleware cap.
+MAX_ASSEMBLED_SIZE_BYTES = 100 * 1024 * 1024  # 100 MB per assembled upload
+
+_UPLOAD_ID_RE = re.compile(r"^[A-Za-z0-9-]{1,64}$")
+
+
+def _prune_stale_uploads() -> None:
+    """Drop upload directories untouched for UPLOAD_TTL_SECONDS.
+
+    Abandoned transfers would otherwise hold their part files (up to 20 MB
+    each) on disk forever.
+    """
+    cutoff = time.time() - UPLOAD_TTL_SECONDS
+    try:
+        entries = list(os.scandir(CHUNK_UPLOAD_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        with contextlib.suppress(OSError):
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                logger.info("Chunked upload %s: reaped as stale", entry.name)
+
+
+def _read_upload_total(upload_dir: str):
+    """Read the chunk count recorded for an upload, or None if absent."""
+    try:
+        with open(os.path.join(upload_dir, "total"), "r") as fh:
+            return int(fh.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _received_chunks(upload_dir: str) -> set:
+    """Indices of the part files currently on disk for an upload."""
+    try:
+        return {
+            int(e.name[:-5])
+            for e in os.scandir(upload_dir)
+            if e.name.endswith(".part")
+        }
+    except OSError:
+        return set()
+
+
+def _parts_size(upload_dir: str) -> int:
+    """Combined size of the part files currently on disk for an upload."""
+    try:
+        return sum(
+            e.stat().st_size for e in os.scandir(upload_dir) if e.name.endswith(".part")
+        )
+    except OSError:
+        return 0
+
+
+def _assemble_parts(upload_dir: str, total: int) -> int:
+    """Concatenate part files into assembled.pdf, returning the byte count.
+
+    Blocking file I/O — run via asyncio.to_thread so a multi-hundred-MB
+    assembly does not stall the worker's event loop.
+    """
+    assembled_path = os.path.join(upload_dir, "assembled.pdf")
+    size = 0
+    with open(assembled_path, "wb") as assembled:
+        for index in range(total):
+            part_path = os.path.join(upload_dir, f"{index:06d}.part")
+            with open(part_path, "rb") as part:
+                while chunk := part.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_ASSEMBLED_SIZE_BYTES:
+                        raise ValueError(
+                            "Assembled upload exceeds the 100 MB size limit."
+                        )
+                    assembled.write(chunk)
+            os.unlink(part_path)
+    return size
+
+# ── Reusable document sets ─────────────────────────────────────────────────────
+# Extracted text for an uploaded document pair, keyed by doc_set_id, so clients
+# can fan out many questions without re-uploading (or re-parsing) the PDFs.
+# Sets are spilled to a shared temp directory so that under gunicorn any worker
+# can serve a doc_set_id issued by another; the per-process dict is a hot cache.
+DOC_SET_LIMIT = 64
+DOC_SET_DIR = os.path.join(tempfile.gettempdir(), "insurance_chatbot_docsets")
+_doc_sets: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _cache_doc_set(doc_set_id: str, doc_set: tuple) -> None:
+    _doc_sets[doc_set_id] = doc_set
+    _doc_sets.move_to_end(doc_set_id)
+    while len(_doc_sets) > DOC_SET_LIMIT:
+        _doc_sets.popitem(last=False)
+
+
+def _store_doc_set(doc_set_id: str, policy_text: str, schedule_text: str) -> None:
+    """Persist a doc set to the shared spill directory and the local cache."""
+    os.makedirs(DOC_SET_DIR, exist_ok=True)
+    path = os.path.join(DOC_SET_DIR, f"{doc_set_id}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(orjson.dumps({"policy": policy_text, "schedule": schedule_text}))
+    os.replace(tmp_path, path)  # atomic — other workers never see a partial write
+
+    _cache_doc_set(doc_set_id, (policy_text, schedule_text))
+
+    # Cap the shared directory too: drop the oldest spilled sets beyond the limit
+    with contextlib.suppress(OSError):
+        spilled = sorted(
+            (e for e in os.scandir(DOC_SET_DIR) if e.name.endswith(".json")),
+            key=lambda e: e.stat().st_mtime,
+        )
+        for stale in spilled[:max(0, len(spilled) - DOC_SET_LIMIT)]:
+            with contextlib.suppress(OSError):
+                os.unlink(stale.path)
+
+
+def _load_doc_set(doc_set_id: str):
+    """Fetch a doc set from the local cache, falling back to the spill directory.
+
+    Returns (policy_text, schedule_text) or None if the id is unknown (never
+    issued, or evicted everywhere).
+    """
+    doc_set = _doc_sets.get(doc_set_id)
+    if doc_set is not None:
+        _doc_sets.move_to_end(doc_set_id)
+        return doc_set
+
+    if not _UPLOAD_ID_RE.match(doc_set_id):
+        return None
+    try:
+        with open(os.path.join(DOC_SET_DIR, f"{doc_set_id}.json"), "rb") as fh:
+            data = orjson.loads(fh.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+    doc_set = (data["policy"], data["schedule"])
+    _cache_doc_set(doc_set_id, doc_set)
+    return doc_set
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
@@ -31,40 +193,91 @@ async def _read_and_validate_files(
     files: List[UploadFile],
     label: str,
     pdf_extractor: PDFExtractor,
+    pool: Executor,
 ) -> List[str]:
     """
     Read, size-check, type-check, and extract text from a list of uploaded files.
     Returns a list of extracted text strings (one per file).
     Raises HTTPException on any validation failure.
-    """
-    texts = []
-    for f in files:
-        # Content-type check
-        if f.content_type not in ALLOWED_CONTENT_TYPES:
-            logger.warning(
-                "Validation failed: %s '%s' is not a PDF (%s)",
-                label, f.filename, f.content_type
-            )
-            raise HTTPException(
-                status_code=400,
-                detail=f"{label} '{f.filename}' must be a PDF file (got {f.content_type})"
-            )
 
-        raw = await f.read()
-
-        # Size check
-        if len(raw) > MAX_FILE_SIZE_BYTES:
-            logger.warning(
-                "Validation failed: %s '%s' exceeds size limit (%d bytes)",
-                label, f.filename, len(raw)
-            )
-            raise HTTPException(
-                status_code=413,
-                detail=f"{label} '{f.filename}' exceeds the 20 MB file size limit."
-            )
+    Uploads are streamed to temp files in 1 MB chunks (hashing as we go), so
+    peak memory stays O(chunk) per file instead of O(file) — the extractor
+    parses straight from disk.
+    """
+    tmp_paths = []
+    digests = []
+    try:
+        for f in files:
+            # Content-type check
+            if f.content_type not in ALLOWED_CONTENT_TYPES:
+                logger.warning(
+                    "Validation failed: %s '%s' is not a PDF (%s)",
+                    label, f.filename, f.content_type
+                )
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{label} '{f.filename}' must be a PDF file (got {f.content_type})"
+                )
 
-        text = pdf_extractor.extract_text(raw)
+            # Early size check — Starlette has already spooled the multipart
+            # body by the time the handler runs, so this saves the hashing and
+            # extraction work, not the disk write; the Content-Length
+            # middleware in main.py is the only gate that rejects before
+            # buffering.
+            if f.size and f.size > MAX_FILE_SIZE_BYTES:
+                logger.warning(
+                    "Validation failed: %s '%s' exceeds size limit (%d bytes, rejected early)",
+                    label, f.filename, f.size
+                )
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"{label} '{f.filename}' exceeds the 20 MB file size limit."
+                )
 
+            # Stream to disk, hashing and size-checking chunk by chunk
+            hasher = hashlib.blake2b(digest_size=16)
+            size = 0
+            tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+            tmp_paths.append(tmp.name)
+            try:
+                while chunk := await f.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_FILE_SIZE_BYTES:
+                        logger.warning(
+                            "Validation failed: %s '%s' exceeds size limit (>%d bytes)",
+                            label, f.filename, MAX_FILE_SIZE_BYTES
+                        )
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"{label} '{f.filename}' exceeds the 20 MB file size limit."
+                        )
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+            finally:
+                tmp.close()
+            digests.append(hasher.digest())
+
+        # Extract all files concurrently in the process pool — parsing is
+        # CPU-bound, so worker processes scale across cores without touching
+        # the event-loop process's GIL. Paths and digests pickle cheaply.
+        loop = asyncio.get_running_loop()
+        try:
+            texts = list(await asyncio.gather(
+                *(
+                    loop.run_in_executor(pool, pdf_extractor.extract_text_path, path, digest)
+                    for path, digest in zip(tmp_paths, digests)
+                )
+            ))
+        except ValueError as e:
+            # Extraction failures cross the pool boundary as plain ValueError
+            # (HTTPException does not survive pickling) — translate them here.
+            raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        for path in tmp_paths:
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+
+    for f, text in zip(files, texts):
         # Empty extraction check
         if not text.strip():
             logger.warning(
@@ -80,25 +293,222 @@ async def _read_and_validate_files(
             )
 
         logger.info("        %s '%s' → %d chars extracted", label, f.filename, len(text))
-        texts.append(text)
 
     return texts
 
 
-# ── Route ──────────────────────────────────────────────────────────────────────
+async def _extract_document_texts(
+    request: Request,
+    policy_disclosure: List[UploadFile],
+    schedule_coverage: List[UploadFile],
+    pdf_extractor: PDFExtractor,
+) -> tuple:
+    """Validate and extract both document sets, returning (policy, schedule) text."""
+    pdf_pool = request.app.state.pdf_pool
+
+    schedule_text = ""
+    if schedule_coverage:
+        # Both document sets are independent — parse them in parallel
+        policy_texts, schedule_texts = await asyncio.gather(
+            _read_and_validate_files(
+                policy_disclosure, "Policy Disclosure", pdf_extractor, pdf_pool
+            ),
+            _read_and_validate_files(
+                schedule_coverage, "Schedule of Coverage", pdf_extractor, pdf_pool
+            ),
+        )
+        schedule_text = "\n\n".join(schedule_texts)
+    else:
+        policy_texts = await _read_and_validate_files(
+            policy_disclosure, "Policy Disclosure", pdf_extractor, pdf_pool
+        )
+        logger.info("        schedule_coverage → skipped (not provided)")
 
-@router.post("/analyze-coverage", response_model=CoverageResponse)
-async def analyze_coverage(
+    policy_text = "\n\n".join(policy_texts)
+    logger.info(
+        "        extracted text → %d chars policy, %d chars schedule",
+        len(policy_text), len(schedule_text),
+    )
+    return policy_text, schedule_text
+
+
+# ── Routes ─────────────────────────────────────────────────────────────────────
+
+@router.get("/health", response_model=HealthResponse)
+def health_check(analyzer: InsuranceAnalyzer = Depends(get_insurance_analyzer)):
+    """Liveness probe — reports the configured model and current time."""
+    return HealthResponse(
+        status="ok",
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        model=analyzer.model,
+    )
+
+
+@router.get("/status")
+def status_check(analyzer: InsuranceAnalyzer = Depends(get_insurance_analyzer)):
+    """Aggregated probe — health and API info in a single round-trip."""
+    return {
+        "health": health_check(analyzer).model_dump(),
+        "info": {"message": "Welcome to the Insurance Chatbot API"},
+    }
+
+
+@router.post("/upload-chunk")
+async def upload_chunk(request: Request):
+    """Receive one fixed-size part of a chunked PDF upload.
+
+    Chunks may arrive in any order and in parallel; each is streamed straight
+    to its own part file. Re-sending a chunk simply overwrites it, which makes
+    retries cheap.
+    """
+    upload_id = request.headers.get("X-Upload-Id", "")
+    chunk_index = request.headers.get("X-Chunk-Index", "")
+    total_chunks = request.headers.get("X-Total-Chunks", "")
+
+    if not _UPLOAD_ID_RE.match(upload_id):
+        raise HTTPException(status_code=400, detail="Invalid or missing X-Upload-Id header.")
+    if not chunk_index.isdigit() or not total_chunks.isdigit() or int(total_chunks) < 1:
+        raise HTTPException(
+            status_code=400,
+            detail="X-Chunk-Index and X-Total-Chunks must be non-negative integers.",
+        )
+    index, total = int(chunk_index), int(total_chunks)
+    if index >= total or total > 1024:
+        raise HTTPException(status_code=400, detail="X-Chunk-Index out of range.")
+
+    upload_dir = os.path.join(CHUNK_UPLOAD_DIR, upload_id)
+    if not os.path.isdir(upload_dir):
+        _prune_stale_uploads()
+        try:
+            active = sum(1 for e in os.scandir(CHUNK_UPLOAD_DIR) if e.is_dir())
+        except OSError:
+            active = 0
+        if active >= MAX_ACTIVE_UPLOADS:
+            raise HTTPException(
+                status_code=429, detail="Too many uploads in progress — retry later."
+            )
+    os.makedirs(upload_dir, exist_ok=True)
+
+    recorded_total = _read_upload_total(upload_dir)
+    if recorded_total is None:
+        # First chunk to arrive (on any worker) records the expected count
+        with open(os.path.join(upload_dir, "total"), "w") as fh:
+            fh.write(str(total))
+    elif recorded_total != total:
+        raise HTTPException(status_code=409, detail="X-Total-Chunks changed mid-upload.")
+
+    size = 0
+    part_path = os.path.join(upload_dir, f"{index:06d}.part")
+    tmp_path = f"{part_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as part:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_FILE_SIZE_BYTES:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+                raise HTTPException(status_code=413, detail="Chunk exceeds the size limit.")
+            part.write(chunk)
+
+    # Enforce the assembled-size cap during accumulation — per-chunk limits
+    # alone would let 1024 × 20 MB parts pile up before assembly rejects them
+    if _parts_size(upload_dir) + size > MAX_ASSEMBLED_SIZE_BYTES:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise HTTPException(
+            status_code=413, detail="Upload exceeds the 100 MB total size limit."
+        )
+
+    # Atomic publish — a part only counts as received once fully written
+    os.replace(tmp_path, part_path)
+
+    received = len(_received_chunks(upload_dir))
+    logger.info(
+        "Chunked upload %s: part %d/%d received (%d bytes, %d/%d done)",
+        upload_id, index + 1, total, size, received, total,
+    )
+    return {
+        "upload_id": upload_id,
+        "chunk_index": index,
+        "received": received,
+        "total_chunks": total,
+    }
+
+
+@router.post("/upload-complete")
+async def upload_complete(body: UploadCompleteRequest):
+    """Assemble a finished chunked upload into a single PDF."""
+    if not _UPLOAD_ID_RE.match(body.upload_id):
+        raise HTTPException(status_code=400, detail="Invalid upload_id.")
+    upload_dir = os.path.join(CHUNK_UPLOAD_DIR, body.upload_id)
+    total = _read_upload_total(upload_dir)
+    if total is None:
+        raise HTTPException(status_code=404, detail="Unknown upload_id.")
+
+    missing = sorted(set(range(total)) - _received_chunks(upload_dir))
+    if missing:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete — missing chunks: {missing[:10]}",
+        )
+
+    try:
+        size = await asyncio.to_thread(_assemble_parts, upload_dir, total)
+    except ValueError as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail=str(e))
+
+    logger.info("Chunked upload %s: assembled %d bytes", body.upload_id, size)
+    return {"upload_id": body.upload_id, "size": size}
+
+
+@router.post("/upload-docs")
+async def upload_docs(
+    request: Request,
     policy_disclosure: List[UploadFile] = File(
         ..., description="Policy Disclosure Statement PDFs (one or more)"
     ),
     schedule_coverage: List[UploadFile] = File(
         default=[], description="Schedule of Coverage PDFs (optional)"
     ),
+    pdf_extractor: PDFExtractor = Depends(get_pdf_extractor),
+):
+    """Upload a document pair once; the returned doc_set_id can be passed to
+    analyze-coverage for any number of follow-up questions."""
+    policy_text, schedule_text = await _extract_document_texts(
+        request, policy_disclosure, schedule_coverage, pdf_extractor
+    )
+
+    doc_set_id = uuid.uuid4().hex
+    _store_doc_set(doc_set_id, policy_text, schedule_text)
+
+    logger.info("Doc set %s stored (%d + %d chars)", doc_set_id, len(policy_text), len(schedule_text))
+    return {
+        "doc_set_id": doc_set_id,
+        "policy_chars": len(policy_text),
+        "schedule_chars": len(schedule_text),
+    }
+
+
+@router.post("/analyze-coverage", response_model=CoverageResponse, response_class=ORJSONResponse)
+async def analyze_coverage(
+    request: Request,
+    policy_disclosure: List[UploadFile] = File(
+        default=[], description="Policy Disclosure Statement PDFs (omit when passing doc_set_id)"
+    ),
+    schedule_coverage: List[UploadFile] = File(
+        default=[], description="Schedule of Coverage PDFs (optional)"
+    ),
     insurance_type: str = Form(
         ..., description="Type of insurance (e.g. home, contents, landlord, auto)"
     ),
     question: str = Form(..., description="Your question about insurance coverage"),
+    doc_set_id: str = Form(
+        default="", description="Reuse a document set from a prior /upload-docs call"
+    ),
+    upload_id: str = Form(
+        default="", description="Analyze a PDF assembled by a prior /upload-complete call"
+    ),
     pdf_extractor: PDFExtractor = Depends(get_pdf_extractor),
     analyzer: InsuranceAnalyzer = Depends(get_insurance_analyzer),
 ):
@@ -132,29 +542,59 @@ async def analyze_coverage(
 
     try:
         # ── [2/4] Extract PDF text ─────────────────────────────────────────────
-        logger.info("  [2/4] Extracting text from PDFs ...")
-
-        policy_texts = await _read_and_validate_files(
-            policy_disclosure, "Policy Disclosure", pdf_extractor
-        )
-        policy_text = "\n\n".join(policy_texts)
-
-        schedule_text = ""
-        if schedule_coverage:
-            schedule_texts = await _read_and_validate_files(
-                schedule_coverage, "Schedule of Coverage", pdf_extractor
+        if doc_set_id:
+            doc_set = _load_doc_set(doc_set_id)
+            if doc_set is None:
+                raise HTTPException(status_code=404, detail="Unknown doc_set_id.")
+            policy_text, schedule_text = doc_set
+            logger.info(
+                "  [2/4] Reusing doc set %s (%d + %d chars)",
+                doc_set_id, len(policy_text), len(schedule_text),
+            )
+        elif upload_id:
+            # The assembled file lives on shared disk, so any worker can serve
+            # an upload completed by another.
+            assembled_path = None
+            if _UPLOAD_ID_RE.match(upload_id):
+                candidate = os.path.join(CHUNK_UPLOAD_DIR, upload_id, "assembled.pdf")
+                if os.path.exists(candidate):
+                    assembled_path = candidate
+            if assembled_path is None:
+                raise HTTPException(
+                    status_code=404, detail="Unknown upload_id or upload not completed."
+                )
+            logger.info("  [2/4] Extracting text from assembled upload %s ...", upload_id)
+            loop = asyncio.get_running_loop()
+            try:
+                policy_text = await loop.run_in_executor(
+                    request.app.state.pdf_pool, pdf_extractor.extract_text_path, assembled_path
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=500, detail=str(e))
+            schedule_text = ""
+            if not policy_text.strip():
+                raise HTTPException(
+                    status_code=422,
+                    detail=(
+                        "Assembled upload produced no readable text. "
+                        "The file may be scanned, image-only, or corrupt."
+                    ),
+                )
+        elif policy_disclosure:
+            logger.info("  [2/4] Extracting text from PDFs ...")
+            policy_text, schedule_text = await _extract_document_texts(
+                request, policy_disclosure, schedule_coverage, pdf_extractor
             )
-            schedule_text = "\n\n=== SCHEDULE OF COVERAGE ===\n" + "\n\n".join(schedule_texts)
         else:
-            logger.info("        schedule_coverage → skipped (not provided)")
-
-        combined_text = f"=== POLICY DISCLOSURE STATEMENT ===\n{policy_text}{schedule_text}"
-        logger.info("        combined text → %d chars total", len(combined_text))
+            raise HTTPException(
+                status_code=400,
+                detail="Provide policy_disclosure files, a doc_set_id, or an upload_id.",
+            )
 
         # ── [3/4] AI analysis ──────────────────────────────────────────────────
-        logger.info("  [3/4] Sending to OpenAI (%s) ...", analyzer.settings.OPENAI_MODEL)
+        logger.info("  [3/4] Sending to OpenAI (%s) ...", analyzer.model)
         ai_start = time.perf_counter()
-        result = analyzer.analyze_coverage(combined_text, question, insurance_type)
+        result = await analyzer.analyze_coverage(policy_text, schedule_text, question, insurance_type)
         ai_elapsed = (time.perf_counter() - ai_start) * 1000
         logger.info("        OpenAI responded in %.0f ms", ai_elapsed)
         logger.info(
@@ -1,6 +1,13 @@
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+
+# Reject request bodies larger than this before buffering them — generous
+# headroom over the per-file PDF limit enforced in the coverage endpoint.
+MAX_REQUEST_BYTES = 100 * 1024 * 1024  # 100 MB
 from app.core.config import get_settings
 from app.core.logger import setup_logger, get_logger
 from app.api.v1.endpoints import coverage
@@ -18,6 +25,7 @@ app = FastAPI(
     description=settings.PROJECT_DESCRIPTION,
     version=settings.PROJECT_VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,  # C-backed serializer, emits bytes directly
 )
 
 # Add CORS middleware
@@ -30,6 +38,21 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def reject_oversized_requests(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BYTES:
+        logger.warning(
+            "Rejected %s %s — declared body of %s bytes exceeds the %d byte limit",
+            request.method, request.url.path, content_length, MAX_REQUEST_BYTES,
+        )
+        return ORJSONResponse(
+            status_code=413,
+            content={"detail": "Request body too large."},
+        )
+    return await call_next(request)
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     start = time.perf_counter()
@@ -42,6 +65,14 @@ async def log_requests(request: Request, call_next):
 
 @app.on_event("startup")
 async def on_startup():
+    # PDF parsing is CPU-bound; a process pool lets concurrent requests use
+    # spare cores instead of contending on this process's GIL. Every gunicorn
+    # worker builds its own pool, so divide the cores by the worker count
+    # (WEB_CONCURRENCY, exported by gunicorn_conf.py) rather than letting
+    # each worker claim all of them.
+    web_concurrency = int(os.getenv("WEB_CONCURRENCY", "1"))
+    pool_size = max(1, (os.cpu_count() or 1) // web_concurrency)
+    app.state.pdf_pool = ProcessPoolExecutor(max_workers=pool_size)
     logger.info("=" * 60)
     logger.info("  %s  v%s", settings.PROJECT_NAME, settings.PROJECT_VERSION)
     logger.info("  Model : %s", settings.OPENAI_MODEL)
@@ -51,6 +82,7 @@ async def on_startup():
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    app.state.pdf_pool.shutdown(wait=False, cancel_futures=True)
     logger.info("Server shutting down.")
 
 
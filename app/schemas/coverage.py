@@ -56,6 +56,17 @@ class CoverageResponse(BaseModel):
         }
 
 
+class UploadCompleteRequest(BaseModel):
+    upload_id: str
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "upload_id": "9f1c2b8a417c4f7e8a1d2c3b4e5f6a7b"
+            }
+        }
+
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: str
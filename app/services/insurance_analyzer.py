@@ -1,6 +1,9 @@
-from typing import List, Literal, Optional
+from typing import List, Literal
+from functools import lru_cache
 import re
-from openai import OpenAI
+import tiktoken
+from openai import AsyncOpenAI
+from rank_bm25 import BM25Okapi
 from pydantic import BaseModel
 from app.core.config import get_settings
 from app.core.logger import get_logger
@@ -9,11 +12,92 @@ logger = get_logger(__name__)
 
 # ── Constants ──────────────────────────────────────────────────────────────────
 MAX_CONTENT_CHARS = 80_000   # ~20k tokens — safe ceiling for gpt-4o-mini
+MAX_SELECTED_TOKENS = 8_000  # token budget when relevance-selecting oversized docs
+MIN_CHUNKS_FOR_SELECTION = 4
 EXPLANATION_MIN = 3
 EXPLANATION_MAX = 6
 POLICY_NOTES_MIN = 6
 POLICY_NOTES_MAX = 12
 
+# Precompiled patterns — these run on every analyze request, so pay the
+# compile cost once at import time instead of per call.
+_MULTI_NEWLINE_RE = re.compile(r'\n{3,}')
+_MULTI_SPACE_RE = re.compile(r' {2,}')
+_WHITESPACE_RE = re.compile(r'\s+')
+_TRAILING_WS_RE = re.compile(r'[ \t]+$', re.MULTILINE)
+_CHUNK_SPLIT_RE = re.compile(r'\n\s*\n')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    try:
+        return tiktoken.encoding_for_model(get_settings().OPENAI_MODEL)
+    except KeyError:
+        # Model newer than this tiktoken release — budget with the current
+        # OpenAI encoding rather than failing.
+        return tiktoken.get_encoding("o200k_base")
+
+
+# Static instruction/schema block — built once at import instead of re-rendered
+# per request; _build_system_prompt appends the document content to it.
+_SYSTEM_PROMPT_STATIC = """You are an insurance policy analysis assistant for Covermate.
+
+ROLE:
+- Analyse policy documents and return a structured, factual report based ONLY on provided policy data.
+- Do NOT provide advice, recommendations, or opinions.
+- Do NOT hallucinate clause names — use only clause names present in the document.
+- Do NOT infer beyond the wording present in the documents.
+- Use plain, direct language.
+
+STYLE RULES:
+- Never use: "you should", "we recommend", "consider", or any advisory language.
+- Clearly separate what triggers cover from what excludes it.
+- Be concise and non-repetitive.
+- If the policy is silent on the question, state that explicitly.
+
+Return a JSON object matching this exact schema:
+
+{
+    "policy_name": "Extract exact policy name from document. Use N/A if not found.",
+    "user_question": "Repeat the user question verbatim.",
+    "direct_answer": "Likelihood scale: 'highly unlikely' | 'unlikely' | 'likely' | 'very likely'. Based on how clearly the policy wording supports coverage for this scenario.",
+    "explanation": [
+        "3 to 6 bullet points. Reference specific clause names from the document only.",
+        "Each point explains what triggers cover OR what excludes it.",
+        "No advice, no speculation, no invented clauses."
+    ],
+    "explanation_summary": "One sentence: what the coverage outcome depends on.",
+    "policy_notes": [
+        "6 to 12 one-line notes describing the policy's GENERAL exclusions, limitations, sub-limits, and claim conditions.",
+        "These should NOT be specific to the user question; they are broad policy warnings every holder should know.",
+        "Format each as: <Issue> — <what it means> (<Clause Name>)",
+        "Flag: exclusions, limits, claim constraints, structural gaps, things that are NOT covered regardless of cause."
+    ],
+    "policy_price": "If a price is visible in the documents, state it exactly. Otherwise: Not listed in provided documents",
+    "final_summary": "One sentence summarising coverage determination by key clauses."
+}
+
+IMPORTANT: Respond with valid JSON only. No markdown fences, no preamble.
+
+INSURANCE DOCUMENTS:
+"""
+
+# Validation constants — built once instead of per validate_response call
+_VALID_LIKELIHOODS = frozenset({"highly unlikely", "unlikely", "likely", "very likely"})
+_MISSING_PRICE_VALUES = frozenset({"none", "n/a", "null", "", "not available"})
+_DEFAULT_EXPLANATION_POINT = (
+    "Coverage outcome depends on the documented cause of loss and applicable exclusions."
+)
+_DEFAULT_EXPLANATION_SUMMARY = (
+    "Coverage depends on the proven cause of loss under the relevant "
+    "insured-event and exclusion clauses."
+)
+_DEFAULT_FINAL_SUMMARY = (
+    "Coverage is determined by the policy's insuring clauses, "
+    "exclusions, and conditions."
+)
+
 
 # ── Structured output schema ───────────────────────────────────────────────────
 class CoverageAnalysisOutput(BaseModel):
@@ -32,13 +116,30 @@ class CoverageAnalysisOutput(BaseModel):
     final_summary: str
 
 
+# ── Singleton access ───────────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def get_analyzer() -> "InsuranceAnalyzer":
+    """Process-wide InsuranceAnalyzer singleton.
+
+    Constructing an OpenAI client allocates a fresh httpx connection pool, so a
+    per-request instance would pay a new TLS handshake to api.openai.com on
+    every call. One shared instance keeps the connection pool (and keep-alive)
+    across requests.
+    """
+    return InsuranceAnalyzer()
+
+
 # ── Main service ───────────────────────────────────────────────────────────────
 class InsuranceAnalyzer:
     """Service for analysing insurance coverage based on policy documents."""
 
     def __init__(self):
-        self.settings = get_settings()
-        self.client = OpenAI(api_key=self.settings.OPENAI_API_KEY)
+        # Cache the settings values we need as plain attributes — the hot path
+        # then does bare attribute reads instead of Pydantic BaseSettings
+        # lookups on every request.
+        settings = get_settings()
+        self.model = settings.OPENAI_MODEL
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
     # ── Text helpers ───────────────────────────────────────────────────────────
 
@@ -48,11 +149,11 @@ class InsuranceAnalyzer:
         Avoids wrapping mid-sentence words in === headers (previous bug).
         """
         # Collapse excessive blank lines
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _MULTI_NEWLINE_RE.sub('\n\n', text)
         # Collapse multiple spaces
-        text = re.sub(r' {2,}', ' ', text)
-        # Strip trailing whitespace per line
-        text = '\n'.join(line.rstrip() for line in text.splitlines())
+        text = _MULTI_SPACE_RE.sub(' ', text)
+        # Strip trailing whitespace per line (single multiline sweep, no split/join)
+        text = _TRAILING_WS_RE.sub('', text)
         return text.strip()
 
     def truncate_content(self, text: str) -> str:
@@ -68,6 +169,44 @@ class InsuranceAnalyzer:
             return text[:MAX_CONTENT_CHARS] + "\n\n[NOTE: Document truncated due to length]"
         return text
 
+    def _select_relevant_sections(self, text: str, question: str) -> str:
+        """
+        Trim oversized content to the chunks most relevant to the question.
+
+        Splits on blank lines, scores each chunk against the question with
+        BM25, and keeps the best-scoring chunks (in document order) up to
+        MAX_SELECTED_TOKENS. Only called when the document would otherwise be
+        blindly truncated, so this trades nothing on small policies.
+        """
+        chunks = [c for c in _CHUNK_SPLIT_RE.split(text) if c.strip()]
+        if len(chunks) < MIN_CHUNKS_FOR_SELECTION:
+            return self.truncate_content(text)
+
+        tokenized = [_WORD_RE.findall(c.lower()) for c in chunks]
+        scores = BM25Okapi(tokenized).get_scores(_WORD_RE.findall(question.lower()))
+
+        encoding = _token_encoding()
+        budget = MAX_SELECTED_TOKENS
+        selected = []
+        for idx in sorted(range(len(chunks)), key=scores.__getitem__, reverse=True):
+            cost = len(encoding.encode(chunks[idx]))
+            if cost > budget:
+                continue
+            budget -= cost
+            selected.append(idx)
+            if budget <= 0:
+                break
+
+        if not selected:
+            return self.truncate_content(text)
+
+        selected.sort()  # preserve document order for the model
+        logger.info(
+            "Analyzer: relevance-selected %d/%d chunks (~%d tokens) for the prompt",
+            len(selected), len(chunks), MAX_SELECTED_TOKENS - budget,
+        )
+        return "\n\n".join(chunks[i] for i in selected)
+
     def _normalize_list(self, value) -> List[str]:
         """Normalise model output into a clean list of non-empty single-line strings."""
         if isinstance(value, str):
@@ -79,7 +218,7 @@ class InsuranceAnalyzer:
 
         cleaned = []
         for item in items:
-            single_line = re.sub(r"\s+", " ", item).strip()
+            single_line = _WHITESPACE_RE.sub(" ", item).strip()
             if single_line:
                 cleaned.append(single_line)
         return cleaned
@@ -96,25 +235,19 @@ class InsuranceAnalyzer:
 
         # Direct answer — likelihood scale
         direct_answer = str(result.get("direct_answer") or "").strip().lower()
-        valid_likelihoods = {"highly unlikely", "unlikely", "likely", "very likely"}
-        if direct_answer not in valid_likelihoods:
+        if direct_answer not in _VALID_LIKELIHOODS:
             direct_answer = "unable to determine"
 
         # Explanation points
         explanation = self._normalize_list(result.get("explanation"))
         explanation = explanation[:EXPLANATION_MAX]
         while len(explanation) < EXPLANATION_MIN:
-            explanation.append(
-                "Coverage outcome depends on the documented cause of loss and applicable exclusions."
-            )
+            explanation.append(_DEFAULT_EXPLANATION_POINT)
 
         # Explanation summary — do NOT force-prefix; trust the model
         explanation_summary = str(result.get("explanation_summary") or "").strip()
         if not explanation_summary:
-            explanation_summary = (
-                "Coverage depends on the proven cause of loss under the relevant "
-                "insured-event and exclusion clauses."
-            )
+            explanation_summary = _DEFAULT_EXPLANATION_SUMMARY
 
         # Policy notes
         policy_notes = self._normalize_list(result.get("policy_notes"))
@@ -122,7 +255,7 @@ class InsuranceAnalyzer:
 
         # Policy price — from document only
         raw_price = result.get("policy_price")
-        if not raw_price or str(raw_price).strip().lower() in ("none", "n/a", "null", "", "not available"):
+        if not raw_price or str(raw_price).strip().lower() in _MISSING_PRICE_VALUES:
             policy_price = "Not listed in provided documents"
         else:
             policy_price = str(raw_price).strip()
@@ -130,10 +263,7 @@ class InsuranceAnalyzer:
         # Final summary — do NOT force-prefix; trust the model
         final_summary = str(result.get("final_summary") or "").strip()
         if not final_summary:
-            final_summary = (
-                "Coverage is determined by the policy's insuring clauses, "
-                "exclusions, and conditions."
-            )
+            final_summary = _DEFAULT_FINAL_SUMMARY
 
         return {
             "policy_name": policy_name,
@@ -148,70 +278,60 @@ class InsuranceAnalyzer:
 
     # ── Prompt ─────────────────────────────────────────────────────────────────
 
-    def _build_system_prompt(self) -> str:
-        return """You are an insurance policy analysis assistant for Covermate.
-
-ROLE:
-- Analyse policy documents and return a structured, factual report based ONLY on provided policy data.
-- Do NOT provide advice, recommendations, or opinions.
-- Do NOT hallucinate clause names — use only clause names present in the document.
-- Do NOT infer beyond the wording present in the documents.
-- Use plain, direct language.
-
-STYLE RULES:
-- Never use: "you should", "we recommend", "consider", or any advisory language.
-- Clearly separate what triggers cover from what excludes it.
-- Be concise and non-repetitive.
-- If the policy is silent on the question, state that explicitly."""
-
-    def _build_user_prompt(self, structured_content: str, question: str, insurance_type: str) -> str:
-        return f"""INSURANCE DOCUMENTS:
-{structured_content}
-
-USER QUESTION: {question}
+    def _build_system_prompt(self, structured_content: str) -> str:
+        # The instructions and document block form the long, byte-stable prefix
+        # of the conversation. OpenAI's automatic prompt caching keys on stable
+        # prefixes, so follow-up questions about the same documents only pay
+        # for the short user message — keep this free of anything per-request.
+        return _SYSTEM_PROMPT_STATIC + structured_content
 
-INSURANCE TYPE: {insurance_type.title()} Insurance
+    def _build_user_prompt(self, question: str, insurance_type: str) -> str:
+        return f"""USER QUESTION: {question}
 
-Return a JSON object matching this exact schema:
-
-{{
-    "policy_name": "Extract exact policy name from document. Use N/A if not found.",
-    "user_question": "Repeat the user question verbatim.",
-    "direct_answer": "Likelihood scale: 'highly unlikely' | 'unlikely' | 'likely' | 'very likely'. Based on how clearly the policy wording supports coverage for this scenario.",
-    "explanation": [
-        "3 to 6 bullet points. Reference specific clause names from the document only.",
-        "Each point explains what triggers cover OR what excludes it.",
-        "No advice, no speculation, no invented clauses."
-    ],
-    "explanation_summary": "One sentence: what the coverage outcome depends on.",
-    "policy_notes": [
-        "6 to 12 one-line notes describing the policy's GENERAL exclusions, limitations, sub-limits, and claim conditions.",
-        "These should NOT be specific to the user question; they are broad policy warnings every holder should know.",
-        "Format each as: <Issue> — <what it means> (<Clause Name>)",
-        "Flag: exclusions, limits, claim constraints, structural gaps, things that are NOT covered regardless of cause."
-    ],
-    "policy_price": "If a price is visible in the documents, state it exactly. Otherwise: Not listed in provided documents",
-    "final_summary": "One sentence summarising coverage determination by key clauses."
-}}
-
-IMPORTANT: Respond with valid JSON only. No markdown fences, no preamble."""
+INSURANCE TYPE: {insurance_type.title()} Insurance"""
 
     # ── Core analysis ──────────────────────────────────────────────────────────
 
-    def analyze_coverage(self, pdf_content: str, question: str, insurance_type: str) -> dict:
-        """Analyse insurance coverage based on PDF content and user question."""
-
-        logger.info("Analyzer: cleaning text (%d chars)", len(pdf_content))
-        cleaned = self.clean_text(pdf_content)
-        content = self.truncate_content(cleaned)
-        logger.info("Analyzer: text ready (%d chars) — calling %s", len(content), self.settings.OPENAI_MODEL)
+    async def analyze_coverage(
+        self,
+        policy_text: str,
+        schedule_text: str,
+        question: str,
+        insurance_type: str,
+    ) -> dict:
+        """Analyse insurance coverage based on the extracted document texts."""
+
+        logger.info(
+            "Analyzer: cleaning text (%d + %d chars)", len(policy_text), len(schedule_text)
+        )
+        # Clean each document independently and join exactly once — this avoids
+        # an intermediate copy of the full multi-hundred-KB combined string.
+        parts = ["=== POLICY DISCLOSURE STATEMENT ===\n", self.clean_text(policy_text)]
+        if schedule_text:
+            parts += ["\n\n=== SCHEDULE OF COVERAGE ===\n", self.clean_text(schedule_text)]
+        content = "".join(parts)
+        if len(content) > MAX_CONTENT_CHARS:
+            # Too big to send whole — keep the question-relevant chunks instead
+            # of blindly cutting at the char cap. (Small documents go through
+            # unchanged so the prompt prefix stays cache-stable per document.)
+            try:
+                content = self._select_relevant_sections(content, question)
+            except Exception as e:
+                # tiktoken fetches its vocabulary on first use; if that (or
+                # anything else in selection) fails, degrade to the plain char
+                # cap rather than failing the request.
+                logger.warning(
+                    "Analyzer: relevance selection failed (%s) — falling back to truncation", e
+                )
+                content = self.truncate_content(content)
+        logger.info("Analyzer: text ready (%d chars) — calling %s", len(content), self.model)
 
         try:
-            response = self.client.beta.chat.completions.parse(
-                model=self.settings.OPENAI_MODEL,
+            response = await self.client.beta.chat.completions.parse(
+                model=self.model,
                 messages=[
-                    {"role": "system", "content": self._build_system_prompt()},
-                    {"role": "user",   "content": self._build_user_prompt(content, question, insurance_type)},
+                    {"role": "system", "content": self._build_system_prompt(content)},
+                    {"role": "user",   "content": self._build_user_prompt(question, insurance_type)},
                 ],
                 response_format=CoverageAnalysisOutput,
                 temperature=0,          # deterministic output for factual analysis
@@ -1,59 +1,169 @@
-from typing import Optional
+from typing import Optional, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock
+import hashlib
+import os
 import PyPDF2
 import fitz  # PyMuPDF
 import io
-from fastapi import HTTPException
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# A PDF source is either the raw bytes or a filesystem path. Uploads are
+# streamed to a spooled temp file by the endpoint and passed by path, so the
+# whole document never has to sit in memory alongside the parsed form.
+PdfSource = Union[bytes, str]
+
+# Parallel page extraction — only worth the thread overhead on larger documents
+PARALLEL_PAGE_THRESHOLD = 16
+MAX_EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Plain-text extraction flags — the default "text" set (which keeps
+# TEXT_MEDIABOX_CLIP, so cropped junk outside the page box stays out) plus
+# dehyphenation, which rejoins words broken across line ends before analysis
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT | fitz.TEXT_DEHYPHENATE
+
+# Extraction result cache — users typically ask several questions about the
+# same document pair, so re-parsing the same bytes is pure waste. Keyed by
+# content digest so identical uploads hit regardless of filename.
+EXTRACT_CACHE_SIZE = 64
+_extract_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_extract_cache_lock = Lock()
+
+
+def _open_document(source: PdfSource) -> "fitz.Document":
+    """Open a fitz document from bytes or a filesystem path."""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def _source_label(source: PdfSource) -> str:
+    return f"{len(source)} bytes" if isinstance(source, (bytes, bytearray)) else source
+
+
+def _extract_page_range(source: PdfSource, start: int, stop: int) -> str:
+    """Extract text from pages [start, stop) using a private document handle.
+
+    fitz.Document is not thread-safe, so each worker opens its own handle;
+    get_text releases the GIL, so workers genuinely run in parallel.
+    """
+    doc = _open_document(source)
+    try:
+        return "\n\n".join(doc[i].get_text("text", flags=TEXT_FLAGS) for i in range(start, stop))
+    finally:
+        doc.close()
+
+
+@lru_cache(maxsize=1)
+def get_extractor() -> "PDFExtractor":
+    """Process-wide PDFExtractor singleton — the extractor is stateless."""
+    return PDFExtractor()
+
 
 class PDFExtractor:
     """Service for extracting text from PDF documents"""
-    
+
     @staticmethod
-    def extract_text_pymupdf(pdf_bytes: bytes) -> str:
+    def extract_text_pymupdf(source: PdfSource) -> str:
         """Extract text using PyMuPDF (more accurate for complex layouts)"""
-        logger.debug("PDFExtractor: trying PyMuPDF (%d bytes)", len(pdf_bytes))
+        logger.debug("PDFExtractor: trying PyMuPDF (%s)", _source_label(source))
         try:
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text = ""
-            for page in doc:
-                text += page.get_text("text") + "\n\n"
+            doc = _open_document(source)
             page_count = doc.page_count
-            doc.close()
+
+            if page_count > PARALLEL_PAGE_THRESHOLD and MAX_EXTRACT_WORKERS > 1:
+                doc.close()
+                # Split pages into one contiguous range per worker and join in order
+                workers = min(MAX_EXTRACT_WORKERS, page_count)
+                step = -(-page_count // workers)  # ceil division
+                ranges = [(i, min(i + step, page_count)) for i in range(0, page_count, step)]
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    parts = list(executor.map(
+                        lambda r: _extract_page_range(source, r[0], r[1]), ranges
+                    ))
+                text = "\n\n".join(parts)
+            else:
+                parts = [page.get_text("text", flags=TEXT_FLAGS) for page in doc]
+                doc.close()
+                text = "\n\n".join(parts)
+
             logger.debug("PDFExtractor: PyMuPDF extracted %d pages, %d chars", page_count, len(text))
             return text.strip()
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error extracting text with PyMuPDF: {str(e)}")
+            # Plain ValueError — extraction runs in pool workers, and the error
+            # must pickle cleanly back across the process boundary. The
+            # endpoint translates it into an HTTP response.
+            raise ValueError(f"Error extracting text with PyMuPDF: {str(e)}")
 
     @staticmethod
-    def extract_text_pypdf2(pdf_bytes: bytes) -> str:
+    def extract_text_pypdf2(source: PdfSource) -> str:
         """Fallback extraction using PyPDF2"""
-        logger.debug("PDFExtractor: trying PyPDF2 (%d bytes)", len(pdf_bytes))
+        logger.debug("PDFExtractor: trying PyPDF2 (%s)", _source_label(source))
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-            text = ""
-            for page in pdf_reader.pages:
-                text += (page.extract_text() or "") + "\n\n"
+            stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+            pdf_reader = PyPDF2.PdfReader(stream)
+            text = "\n\n".join(page.extract_text() or "" for page in pdf_reader.pages)
             logger.debug("PDFExtractor: PyPDF2 extracted %d pages, %d chars", len(pdf_reader.pages), len(text))
             return text.strip()
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error extracting text with PyPDF2: {str(e)}")
+            raise ValueError(f"Error extracting text with PyPDF2: {str(e)}")
 
     @classmethod
     def extract_text(cls, pdf_bytes: bytes) -> str:
-        """Extract text using the best available method"""
+        """Extract text from in-memory bytes (cached by content hash)"""
+        digest = hashlib.blake2b(pdf_bytes, digest_size=16).digest()
+        return cls._extract_cached(pdf_bytes, digest)
+
+    @classmethod
+    def extract_text_path(cls, path: str, digest: Optional[bytes] = None) -> str:
+        """Extract text from a PDF on disk.
+
+        `digest` is the blake2b-16 digest of the file contents when the caller
+        already computed it while streaming the upload; it keys the result
+        cache so repeat uploads skip parsing.
+        """
+        if digest is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+            digest = hasher.digest()
+        return cls._extract_cached(path, digest)
+
+    @classmethod
+    def _extract_cached(cls, source: PdfSource, digest: bytes) -> str:
+        with _extract_cache_lock:
+            cached = _extract_cache.get(digest)
+            if cached is not None:
+                _extract_cache.move_to_end(digest)
+                logger.info("PDFExtractor: cache hit → %d chars", len(cached))
+                return cached
+
+        text = cls._extract_text_uncached(source)
+
+        with _extract_cache_lock:
+            _extract_cache[digest] = text
+            _extract_cache.move_to_end(digest)
+            while len(_extract_cache) > EXTRACT_CACHE_SIZE:
+                _extract_cache.popitem(last=False)
+        return text
+
+    @classmethod
+    def _extract_text_uncached(cls, source: PdfSource) -> str:
+        # Fast path: PyMuPDF handles virtually every PDF we see and is 3-10x
+        # faster than PyPDF2, so only fall back when it actually raises.
         try:
-            text = cls.extract_text_pymupdf(pdf_bytes)
-            if text and len(text.strip()) > 50:
-                logger.info("PDFExtractor: used PyMuPDF → %d chars", len(text))
-                return text
-            logger.warning("PDFExtractor: PyMuPDF returned too little text, falling back to PyPDF2")
+            text = cls.extract_text_pymupdf(source)
+            logger.info("PDFExtractor: used PyMuPDF → %d chars", len(text))
+            return text
         except Exception:
             logger.warning("PDFExtractor: PyMuPDF failed, falling back to PyPDF2")
 
-        text = cls.extract_text_pypdf2(pdf_bytes)
-        
+        text = cls.extract_text_pypdf2(source)
+
         logger.info("PDFExtractor: used PyPDF2 → %d chars", len(text))
         return text
@@ -1,32 +1,45 @@
 import re
+from functools import lru_cache
 from typing import List
 
+# Compiled once — these run over multi-hundred-KB extracted policy text
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_MULTI_SPACE_RE = re.compile(r' +')
+
+
+@lru_cache(maxsize=8)
+def _section_line_pattern(sections: tuple) -> re.Pattern:
+    """Build (and cache) one multiline pattern matching any line naming a section"""
+    names = "|".join(re.escape(section) for section in sections)
+    return re.compile(
+        r'^[ \t]*(.*(?:%s).*?)[ \t]*$' % names,
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
 class TextProcessor:
     """Utility class for text processing operations"""
-    
+
     @staticmethod
     def clean_whitespace(text: str) -> str:
         """Remove excessive whitespace from text"""
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = _BLANK_LINES_RE.sub('\n\n', text)
+        text = _MULTI_SPACE_RE.sub(' ', text)
         return text.strip()
-    
+
     @staticmethod
     def identify_sections(text: str, sections: List[str]) -> List[str]:
         """Identify section headers in text"""
-        structured_lines = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if line:
-                # Check if line might be a section header
-                if any(section in line.lower() for section in sections):
-                    structured_lines.append(f"\n=== {line} ===")
-                else:
-                    structured_lines.append(line)
-        
-        return structured_lines
+        # One C-level sweep wraps every section-header line in === markers,
+        # replacing per-line Python searches over the whole document. A NUL
+        # sentinel survives the strip below and is swapped for the leading
+        # newline header entries have always carried.
+        structured = _section_line_pattern(tuple(sections)).sub('\x00=== \\1 ===', text)
+        return [
+            '\n' + line[1:] if line.startswith('\x00') else line
+            for line in map(str.strip, structured.split('\n'))
+            if line
+        ]
     
     @staticmethod
     def ensure_word_count(text: str, target_words: int, padding_words: List[str]) -> str:
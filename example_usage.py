@@ -0,0 +1,357 @@
+"""Smoke-test client for the Insurance Chatbot API.
+
+Probes the health and root endpoints concurrently over one pooled
+aiohttp session.
+
+Usage (with the server running):
+
+    python example_usage.py
+"""
+import argparse
+import asyncio
+import functools
+import io
+import os
+import sys
+import time
+import uuid
+from typing import Final
+
+import aiohttp
+import ijson
+import orjson
+
+BASE_URL: Final = "http://localhost:8000"
+STATUS_PATH: Final = "/api/v1/status"
+ANALYZE_PATH: Final = "/api/v1/analyze-coverage"
+UPLOAD_CHUNK_PATH: Final = "/api/v1/upload-chunk"
+UPLOAD_COMPLETE_PATH: Final = "/api/v1/upload-complete"
+UPLOAD_DOCS_PATH: Final = "/api/v1/upload-docs"
+
+CHUNK_SIZE: Final = 8 * 1024 * 1024  # 8 MB parts
+MAX_PARALLEL_CHUNKS: Final = 4
+QUESTION_CONCURRENCY: Final = 16  # bounded fan-out for multi-question analysis
+
+RETRY_ATTEMPTS: Final = 4
+RETRY_BASE_DELAY: Final = 0.1  # seconds; doubles per attempt
+
+
+# Indented output is for eyeballing, not for timing runs — serializing with
+# OPT_INDENT_2 and pushing the extra bytes through the terminal costs real
+# time on large payloads, so it is opt-in via --pretty.
+PRETTY = False
+
+
+def _render(obj) -> str:
+    """Render a payload as JSON: compact by default, indented with --pretty."""
+    option = orjson.OPT_INDENT_2 if PRETTY else 0
+    return orjson.dumps(obj, option=option).decode()
+
+
+async def with_retry(fn, attempts: int = RETRY_ATTEMPTS, base: float = RETRY_BASE_DELAY):
+    """Await `fn()`, retrying transient failures with exponential backoff.
+
+    Only connection-level errors and timeouts are retried — one dropped SYN
+    should not kill a whole run. HTTP error statuses propagate immediately.
+    """
+    for attempt in range(attempts):
+        try:
+            return await fn()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(base * 2 ** attempt)
+
+# Keep this below any external poller's interval (e.g. a Kubernetes
+# readinessProbe period) so a cached result never masks a state change.
+STATUS_TTL_SECONDS: Final = 5.0
+
+
+def ttl_cache(seconds: float):
+    """Memoize an async fetch for `seconds`.
+
+    Repeated probes inside the window reuse the cached payload instead of a
+    socket round-trip — printing and other side effects belong in callers,
+    not in the cached function.
+    """
+    def decorator(fn):
+        cached = {"at": float("-inf"), "value": None}
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            if now - cached["at"] >= seconds:
+                cached["value"] = await fn(*args, **kwargs)
+                cached["at"] = now
+            return cached["value"]
+
+        return wrapper
+    return decorator
+
+
+@ttl_cache(STATUS_TTL_SECONDS)
+async def fetch_status(session: aiohttp.ClientSession) -> dict:
+    """Fetch the aggregated status payload (health + API info) in one request."""
+    async def _get() -> dict:
+        # Localhost probe: no proxies, no redirects to chase
+        async with session.get(STATUS_PATH, allow_redirects=False) as response:
+            response.raise_for_status()
+            return orjson.loads(await response.read())
+
+    return await with_retry(_get)
+
+
+async def test_health_endpoint(session: aiohttp.ClientSession) -> bool:
+    """Check the health section of the batched status probe."""
+    try:
+        data = (await fetch_status(session)).get("health")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Health check failed: {e}")
+        return False
+    print("Health Check Response:")
+    print(_render(data))
+    return data is not None
+
+
+async def test_root_endpoint(session: aiohttp.ClientSession) -> bool:
+    """Check the info section of the batched status probe."""
+    try:
+        data = (await fetch_status(session)).get("info")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Root check failed: {e}")
+        return False
+    print("Root Endpoint Response:")
+    print(_render(data))
+    return data is not None
+
+
+async def probe_batch(session: aiohttp.ClientSession) -> tuple:
+    """Run both endpoint checks off a single server round-trip."""
+    try:
+        data = await fetch_status(session)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Status probe failed: {e}")
+        return False, False
+
+    # One buffered write instead of four prints — each print is its own
+    # syscall (worse under line-buffered stdout), so batch and flush once.
+    out = io.StringIO()
+    out.write("Health Check Response:\n")
+    out.write(_render(data.get("health")) + "\n")
+    out.write("Root Endpoint Response:\n")
+    out.write(_render(data.get("info")) + "\n")
+    sys.stdout.write(out.getvalue())
+    return data.get("health") is not None, data.get("info") is not None
+
+
+async def analyze_coverage_example(
+    session: aiohttp.ClientSession,
+    policy_path: str,
+    schedule_path: str = None,
+    insurance_type: str = "home",
+    question: str = "Is storm damage to my roof covered under this policy?",
+) -> dict:
+    """Upload policy PDFs and print the structured coverage analysis.
+
+    Open file handles are handed straight to FormData, so aiohttp streams
+    the multipart body to the socket in chunks — memory stays O(chunk)
+    however large the policy PDFs are, instead of buffering whole files.
+    """
+    opened = []
+    try:
+        form = aiohttp.FormData()
+        policy_file = open(policy_path, "rb")
+        opened.append(policy_file)
+        form.add_field(
+            "policy_disclosure", policy_file,
+            filename=os.path.basename(policy_path), content_type="application/pdf",
+        )
+        if schedule_path:
+            schedule_file = open(schedule_path, "rb")
+            opened.append(schedule_file)
+            form.add_field(
+                "schedule_coverage", schedule_file,
+                filename=os.path.basename(schedule_path), content_type="application/pdf",
+            )
+        form.add_field("insurance_type", insurance_type)
+        form.add_field("question", question)
+
+        # Analysis includes an LLM round-trip — allow more than the probe timeout
+        async with session.post(
+            ANALYZE_PATH, data=form, timeout=aiohttp.ClientTimeout(total=120)
+        ) as response:
+            response.raise_for_status()
+            # Build the result incrementally off the socket — ijson consumes
+            # aiohttp's stream directly, so the raw body is never buffered.
+            result = {}
+            async for key, value in ijson.kvitems(response.content, ""):
+                result[key] = value
+    except (OSError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Coverage analysis failed: {e}")
+        return None
+    finally:
+        for fh in opened:
+            fh.close()
+
+    print("Coverage Analysis Response:")
+    print(_render(result))
+    return result
+
+
+async def analyze_questions(
+    session: aiohttp.ClientSession,
+    policy_path: str,
+    questions: list,
+    schedule_path: str = None,
+    insurance_type: str = "home",
+) -> list:
+    """Upload the document pair once, then fan out all questions concurrently.
+
+    The PDFs go up a single time via /upload-docs; each question then posts
+    only the returned doc_set_id, so N questions cost one upload plus N
+    lightweight analysis calls running with bounded parallelism.
+    """
+    form = aiohttp.FormData()
+    with open(policy_path, "rb") as policy_file:
+        form.add_field(
+            "policy_disclosure", policy_file,
+            filename=os.path.basename(policy_path), content_type="application/pdf",
+        )
+        if schedule_path:
+            schedule_file = open(schedule_path, "rb")
+            form.add_field(
+                "schedule_coverage", schedule_file,
+                filename=os.path.basename(schedule_path), content_type="application/pdf",
+            )
+        else:
+            schedule_file = None
+        try:
+            async with session.post(
+                UPLOAD_DOCS_PATH, data=form, timeout=aiohttp.ClientTimeout(total=120)
+            ) as response:
+                response.raise_for_status()
+                doc_set_id = orjson.loads(await response.read())["doc_set_id"]
+        finally:
+            if schedule_file is not None:
+                schedule_file.close()
+
+    semaphore = asyncio.Semaphore(QUESTION_CONCURRENCY)
+
+    async def one(q: str) -> dict:
+        async with semaphore:
+            body = aiohttp.FormData()
+            body.add_field("doc_set_id", doc_set_id)
+            body.add_field("insurance_type", insurance_type)
+            body.add_field("question", q)
+            async with session.post(
+                ANALYZE_PATH, data=body, timeout=aiohttp.ClientTimeout(total=120)
+            ) as response:
+                response.raise_for_status()
+                return orjson.loads(await response.read())
+
+    results = await asyncio.gather(*(one(q) for q in questions))
+    out = io.StringIO()
+    for q, result in zip(questions, results):
+        out.write(f"Q: {q}\n")
+        out.write(f"A: {result['direct_answer']} — {result['explanation_summary']}\n")
+    sys.stdout.write(out.getvalue())
+    return results
+
+
+async def chunked_upload(
+    session: aiohttp.ClientSession,
+    path: str,
+    chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """Upload a large PDF in fixed-size parts with bounded parallelism.
+
+    Parts are sent concurrently (at most MAX_PARALLEL_CHUNKS in flight) and
+    each one retries with exponential backoff, so a transient failure only
+    re-sends that part. A final upload-complete call asks the server to
+    assemble the parts.
+    """
+    upload_id = uuid.uuid4().hex
+    file_size = os.path.getsize(path)
+    total_chunks = max(1, -(-file_size // chunk_size))
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_CHUNKS)
+
+    async def send_chunk(index: int) -> None:
+        async with semaphore:
+            # Each task reads only its own slice — memory stays O(chunk)
+            with open(path, "rb") as fh:
+                fh.seek(index * chunk_size)
+                data = fh.read(chunk_size)
+            headers = {
+                "X-Upload-Id": upload_id,
+                "X-Chunk-Index": str(index),
+                "X-Total-Chunks": str(total_chunks),
+            }
+
+            async def _post() -> None:
+                async with session.post(
+                    UPLOAD_CHUNK_PATH, data=data, headers=headers
+                ) as response:
+                    response.raise_for_status()
+
+            await with_retry(_post)
+
+    await asyncio.gather(*(send_chunk(i) for i in range(total_chunks)))
+
+    async with session.post(
+        UPLOAD_COMPLETE_PATH, json={"upload_id": upload_id}
+    ) as response:
+        response.raise_for_status()
+        result = orjson.loads(await response.read())
+
+    print(f"Chunked upload complete: {result['upload_id']} ({result['size']} bytes)")
+    return result
+
+
+async def warm_up(session: aiohttp.ClientSession) -> None:
+    """Open the TCP connection before any timed call.
+
+    A throwaway GET pays the handshake cost up front so the keep-alive
+    connection it leaves in the pool serves every real request afterwards.
+    (FastAPI registers no HEAD handler for GET routes, so HEAD would 405.)
+    The body is drained and discarded; failures are ignored — the probes
+    will report them properly.
+    """
+    try:
+        async with session.get(STATUS_PATH, allow_redirects=False) as response:
+            await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+
+
+async def main() -> None:
+    timeout = aiohttp.ClientTimeout(total=5)
+    # One pooled connector for every call the script makes — connections are
+    # kept alive between requests, so only the first pays the TCP handshake.
+    connector = aiohttp.TCPConnector(limit=8, limit_per_host=4, keepalive_timeout=30)
+    # trust_env=False keeps HTTP_PROXY/HTTPS_PROXY from intercepting what
+    # should be a direct localhost connection.
+    async with aiohttp.ClientSession(
+        base_url=BASE_URL, timeout=timeout, connector=connector, trust_env=False
+    ) as session:
+        await warm_up(session)
+        # Both checks come back in one round-trip via /api/v1/status
+        health_ok, root_ok = await probe_batch(session)
+
+    sys.stdout.write(
+        f"\nhealth: {'ok' if health_ok else 'FAILED'}\n"
+        f"root  : {'ok' if root_ok else 'FAILED'}\n"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Insurance Chatbot API smoke test")
+    parser.add_argument(
+        "--pretty", action="store_true", help="indent JSON output (slower)"
+    )
+    PRETTY = parser.parse_args().pretty
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # stdlib loop is fine; uvloop just makes the I/O cheaper
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+"""Gunicorn production config.
+
+Run with:
+
+    gunicorn app.main:app -c gunicorn_conf.py
+
+Uvicorn workers default their loop/http implementations to "auto", which
+picks uvloop and httptools when installed (both are in requirements.txt) —
+~2-4x faster than the stdlib event loop / pure-Python HTTP parser for this
+app's I/O profile. `uvicorn.run` in main.py remains the dev entry point.
+"""
+import multiprocessing
+
+bind = "0.0.0.0:8000"
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Tell each worker how many siblings it has so the per-worker PDF process
+# pool can split the cores instead of every worker claiming all of them
+raw_env = [f"WEB_CONCURRENCY={workers}"]
+
+# PDF parsing bursts can hold a worker for a while — give slow uploads room
+timeout = 120
+graceful_timeout = 30
+keepalive = 5